@@ -1,293 +1,19 @@
 from flask import Flask, request, jsonify
-import os
 import json
-import httpx
-from openai import OpenAI
-from dotenv import load_dotenv
-from datetime import datetime
-
-# Load environment variables
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import time
+from mcp_tools.config import get_openai_client
+from mcp_tools.tools import tools, execute_tool
+from mcp_tools.results import encode_tool_result, is_error_result
+from mcp_tools.prefetch import start_prefetch, take_prefetched, discard_prefetch
+from mcp_tools.tracing import start_trace
+from mcp_tools.cache import get_cache, cache_key, toolset_version, ttl_for_tools, parse_cache_control
 
 app = Flask(__name__)
 
-# Example complex query that should use all tools: 
-# "What is the weather in San Francisco, CA? Also, what is the current price of Apple (AAPL) stock? Additionally, find information on the latest news about the stock market. Finally, calculate the monthly mortgage payment for a $500,000 loan with a 3.5% interest rate over 30 years."
-
-# MCP Tool definitions
-def add_numbers(a, b):
-    """Add two numbers and return the result."""
-    print(f"[TOOL] add_numbers executed with args: a={a}, b={b}")
-    result = a + b
-    print(f"[TOOL] add_numbers result: {result}")
-    return result
-
-def get_weather(location=None):
-    """Get weather for a location (currently returns hardcoded response)."""
-    print(f"[TOOL] get_weather executed with location: {location if location else 'default'}")
-    result = f"The weather in {location if location else 'the default location'} is sunny and 75°F."
-    print(f"[TOOL] get_weather result: {result}")
-    return result
-
-def get_stock_price(ticker):
-    """Get the current stock price for a given ticker symbol."""
-    print(f"[TOOL] get_stock_price executed for ticker: {ticker}")
-    # Simulate different prices for different stocks
-    prices = {
-        "AAPL": 187.45,
-        "MSFT": 425.22,
-        "GOOGL": 175.33,
-        "AMZN": 182.87,
-        "META": 478.22,
-        "TSLA": 175.34,
-    }
-    price = prices.get(ticker.upper(), 100.00)  # Default price if ticker not found
-    result = f"The current stock price of {ticker.upper()} is ${price}"
-    print(f"[TOOL] get_stock_price result: {result}")
-    return result
-
-def search_web(query):
-    """Simulates a web search and returns results."""
-    print(f"[TOOL] search_web executed with query: {query}")
-    current_date = datetime.now().strftime("%B %d, %Y")
-    result = f"Web search results for '{query}' as of {current_date}:\n"
-    
-    # Simulate different search results based on keywords
-    if "news" in query.lower():
-        result += "1. Latest headlines: Global markets rally as inflation eases\n"
-        result += "2. Tech industry sees surge in AI investments\n"
-        result += "3. New climate agreement reached at international summit"
-    elif "recipe" in query.lower():
-        result += "1. Easy pasta carbonara recipe: Ready in 15 minutes\n"
-        result += "2. Healthy smoothie recipes for breakfast\n"
-        result += "3. The perfect chocolate chip cookie recipe"
-    else:
-        result += "1. Top results for your search\n"
-        result += "2. Related information from reliable sources\n"
-        result += "3. Wikipedia entries related to your query"
-    
-    print(f"[TOOL] search_web result: {result}")
-    return result
-
-def calculate_mortgage(principal, interest_rate, years):
-    """Calculate monthly mortgage payment."""
-    print(f"[TOOL] calculate_mortgage executed with args: principal={principal}, interest_rate={interest_rate}, years={years}")
-    
-    # Convert annual interest rate to monthly rate
-    monthly_rate = interest_rate / 100 / 12
-    # Total number of payments
-    payments = years * 12
-    
-    # Calculate monthly payment using the mortgage formula
-    if monthly_rate == 0:
-        # Edge case: if interest rate is 0, it's just the principal divided by months
-        monthly_payment = principal / payments
-    else:
-        monthly_payment = principal * (monthly_rate * (1 + monthly_rate) ** payments) / ((1 + monthly_rate) ** payments - 1)
-    
-    result = f"For a ${principal:,.2f} mortgage with {interest_rate}% interest over {years} years, your monthly payment would be ${monthly_payment:.2f}"
-    print(f"[TOOL] calculate_mortgage result: {result}")
-    return result
+MODEL = "o4-mini"
+TOOLSET_VERSION = toolset_version(tools)
 
-# MCP Time Tool functions
-def get_current_time(timezone=None):
-    """Get the current time in a specific timezone or the system timezone."""
-    print(f"[TOOL] get_current_time executed with timezone: {timezone if timezone else 'system default'}")
-    
-    try:
-        payload = {
-            "name": "get_current_time",
-            "arguments": {}
-        }
-        
-        if timezone:
-            payload["arguments"]["timezone"] = timezone
-        
-        response = httpx.post(f"{MCP_TIME_SERVER_URL}/tool", json=payload, timeout=10.0)
-        response.raise_for_status()
-        result = response.json()
-        
-        formatted_result = f"Current time in {result['timezone']}: {result['datetime']} (DST active: {result['is_dst']})"
-        print(f"[TOOL] get_current_time result: {formatted_result}")
-        return formatted_result
-        
-    except Exception as e:
-        error_msg = f"Error getting current time: {str(e)}"
-        print(f"[TOOL] get_current_time error: {error_msg}")
-        return error_msg
-
-def convert_time(source_timezone, time, target_timezone):
-    """Convert time between timezones."""
-    print(f"[TOOL] convert_time executed with args: source={source_timezone}, time={time}, target={target_timezone}")
-    
-    try:
-        payload = {
-            "name": "convert_time",
-            "arguments": {
-                "source_timezone": source_timezone,
-                "time": time,
-                "target_timezone": target_timezone
-            }
-        }
-        
-        response = httpx.post(f"{MCP_TIME_SERVER_URL}/tool", json=payload, timeout=10.0)
-        response.raise_for_status()
-        result = response.json()
-        
-        formatted_result = f"Time conversion: {time} in {source_timezone} is equivalent to {result['target']['datetime']} in {target_timezone} (Time difference: {result['time_difference']})"
-        print(f"[TOOL] convert_time result: {formatted_result}")
-        return formatted_result
-        
-    except Exception as e:
-        error_msg = f"Error converting time: {str(e)}"
-        print(f"[TOOL] convert_time error: {error_msg}")
-        return error_msg
-
-# MCP Tool registry
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "add_numbers",
-            "description": "Add two numbers together",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "a": {"type": "number", "description": "The first number"},
-                    "b": {"type": "number", "description": "The second number"}
-                },
-                "required": ["a", "b"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_weather",
-            "description": "Get the current weather in a location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {"type": "string", "description": "The city and state, e.g. San Francisco, CA"}
-                },
-                "required": []
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_stock_price",
-            "description": "Get the current price of a stock by its ticker symbol",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "ticker": {"type": "string", "description": "The stock ticker symbol, e.g. AAPL for Apple"}
-                },
-                "required": ["ticker"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "search_web",
-            "description": "Search the web for information on a topic",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "The search query"}
-                },
-                "required": ["query"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "calculate_mortgage",
-            "description": "Calculate monthly mortgage payment based on principal, interest rate, and term",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "principal": {"type": "number", "description": "The mortgage principal amount in dollars"},
-                    "interest_rate": {"type": "number", "description": "Annual interest rate as a percentage (e.g., 5.5 for 5.5%)"},
-                    "years": {"type": "integer", "description": "The mortgage term in years"}
-                },
-                "required": ["principal", "interest_rate", "years"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_current_time",
-            "description": "Get the current time in a specific timezone using the MCP time server",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "timezone": {"type": "string", "description": "IANA timezone name (e.g., 'America/New_York', 'Europe/London'). If not provided, system timezone will be used."}
-                },
-                "required": []
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "convert_time",
-            "description": "Convert time between timezones using the MCP time server",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "source_timezone": {"type": "string", "description": "Source IANA timezone name (e.g., 'America/New_York')"},
-                    "time": {"type": "string", "description": "Time in 24-hour format (HH:MM)"},
-                    "target_timezone": {"type": "string", "description": "Target IANA timezone name (e.g., 'Europe/London')"}
-                },
-                "required": ["source_timezone", "time", "target_timezone"]
-            }
-        }
-    }
-]
-
-# Tool dispatcher
-def execute_tool(tool_name, tool_args):
-    print(f"[DISPATCHER] Executing tool: {tool_name} with args: {tool_args}")
-    if tool_name == "add_numbers":
-        result = add_numbers(**tool_args)
-    elif tool_name == "get_weather":
-        result = get_weather(**tool_args)
-    elif tool_name == "get_stock_price":
-        result = get_stock_price(**tool_args)
-    elif tool_name == "search_web":
-        result = search_web(**tool_args)
-    elif tool_name == "calculate_mortgage":
-        result = calculate_mortgage(**tool_args)
-    elif tool_name == "get_current_time":
-        result = get_current_time(**tool_args)
-    elif tool_name == "convert_time":
-        result = convert_time(**tool_args)
-    else:
-        result = f"Unknown tool: {tool_name}"
-        print(f"[DISPATCHER] {result}")
-    
-    print(f"[DISPATCHER] Tool execution complete: {result}")
-    return result
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    # Get the chat message from the request
-    message = request.json.get('message', '')
-    
-    # Print the message to the console
-    print(f"\n[REQUEST] Received message: {message}")
-    
-    # Initialize conversation with a system message and the user's message
-    messages = [
-        {"role": "developer", "content": """You are an AI assistant with access to various tools. Your goal is to help users by providing accurate information and performing calculations as needed.
+SYSTEM_PROMPT = """You are an AI assistant with access to various tools. Your goal is to help users by providing accurate information and performing calculations as needed.
 
 When presented with a request:
 1. Analyze what the user is asking for
@@ -304,11 +30,66 @@ Available tools:
 - get_current_time: Get current time in a specific timezone
 - convert_time: Convert time between timezones
 
-Be conversational but concise. Prioritize accuracy and relevance in your responses."""},
+Be conversational but concise. Prioritize accuracy and relevance in your responses."""
+
+# Example complex query that should use all tools: 
+# "What is the weather in San Francisco, CA? Also, what is the current price of Apple (AAPL) stock? Additionally, find information on the latest news about the stock market. Finally, calculate the monthly mortgage payment for a $500,000 loan with a 3.5% interest rate over 30 years."
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    # Get the chat message from the request
+    message = request.json.get('message', '')
+    
+    # Print the message to the console
+    print(f"\n[REQUEST] Received message: {message}")
+    trace = start_trace("app", {"message": message})
+    
+    # Serve repeated prompts from the cache unless the client opted out
+    cache = get_cache()
+    cache_control = parse_cache_control(request.headers.get("Cache-Control"))
+    bypass_cache = bool(cache_control & {"no-cache", "no-store"})
+    key = cache_key("app", message, MODEL, TOOLSET_VERSION)
+    if cache and not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"[CACHE] Hit for message: {message}")
+            trace.finish(response=cached, cache="hit")
+            response = jsonify(cached)
+            response.headers["X-Cache"] = "HIT"
+            return response
+    
+    # Initialize conversation with a system message and the user's message
+    messages = [
+        {"role": "developer", "content": SYSTEM_PROMPT},
         {"role": "user", "content": message}
     ]
     print(f"[CONVERSATION] Starting with user message: {message}")
     
+    # Kick off likely tool calls so they run while the first model call is in flight
+    prefetched = start_prefetch(message)
+    tools_used = []
+    failed_tools = []
+    try:
+        response = run_reasoning_loop(messages, prefetched, trace, tools_used, failed_tools)
+        cache_outcome = "miss" if cache and not bypass_cache else "bypass"
+        trace.finish(response=response.get_json(), cache=cache_outcome)
+        if cache and "no-store" not in cache_control:
+            if failed_tools:
+                # An answer built around a failed tool call is not worth repeating
+                print(f"[CACHE] Not storing response, tool(s) failed: {sorted(set(failed_tools))}")
+            else:
+                ttl = ttl_for_tools(tools_used)
+                cache.set(key, response.get_json(), ttl)
+                print(f"[CACHE] Stored response (tools: {sorted(set(tools_used))}, ttl: {ttl if ttl is not None else 'none'})")
+        response.headers["X-Cache"] = cache_outcome.upper()
+        return response
+    except Exception as e:
+        trace.finish(status=500, error=str(e))
+        raise
+    finally:
+        discard_prefetch(prefetched)
+
+def run_reasoning_loop(messages, prefetched, trace, tools_used, failed_tools):
     # Start reasoning loop
     loop_count = 0
     while True:
@@ -316,15 +97,24 @@ Be conversational but concise. Prioritize accuracy and relevance in your respons
         print(f"\n[LOOP {loop_count}] Calling OpenAI API")
         
         # Call the OpenAI API
-        response = client.chat.completions.create(
-            model="o4-mini",  # Using the model you specified
+        started = time.perf_counter()
+        response = get_openai_client().chat.completions.create(
+            model=MODEL,  # Using the model you specified
             messages=messages,
             tools=tools,
             tool_choice="auto",
         )
+        trace.model_call(
+            "chat.completions",
+            {"model": MODEL, "messages": list(messages)},
+            response.model_dump(),
+            1000 * (time.perf_counter() - started),
+        )
         
         response_message = response.choices[0].message
         print(f"[LOOP {loop_count}] Received response from OpenAI")
+        if response.usage:
+            print(f"[LOOP {loop_count}] Prompt tokens: {response.usage.prompt_tokens}")
         
         # Add the assistant's response to the conversation
         messages.append(response_message.model_dump())
@@ -337,21 +127,31 @@ Be conversational but concise. Prioritize accuracy and relevance in your respons
             for i, tool_call in enumerate(response_message.tool_calls):
                 function_name = tool_call.function.name
                 function_args = json.loads(tool_call.function.arguments)
+                tools_used.append(function_name)
                 
                 print(f"[LOOP {loop_count}] Tool call {i+1}: {function_name} with args: {function_args}")
                 
-                # Execute the function
-                function_response = execute_tool(function_name, function_args)
+                # Use the prefetched result if we already ran this exact call
+                started = time.perf_counter()
+                hit, function_response = take_prefetched(prefetched, function_name, function_args)
+                if not hit:
+                    # Execute the function
+                    function_response = execute_tool(function_name, function_args)
+                if is_error_result(function_response):
+                    failed_tools.append(function_name)
+                trace.tool_call(function_name, function_args, function_response,
+                                1000 * (time.perf_counter() - started), prefetched=hit)
                 
                 # Append the function response to the messages
+                content = encode_tool_result(function_name, function_response)
                 messages.append({
                     "tool_call_id": tool_call.id,
                     "role": "tool",
                     "name": function_name,
-                    "content": str(function_response),
+                    "content": content,
                 })
                 
-                print(f"[LOOP {loop_count}] Added tool response to conversation: {function_response}")
+                print(f"[LOOP {loop_count}] Added tool response to conversation: {content}")
             
             print(f"[LOOP {loop_count}] All tool calls processed, continuing reasoning loop")
             # Continue the loop to get the next assistant response
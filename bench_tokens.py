@@ -0,0 +1,135 @@
+# Prompt token benchmark for tool results
+# Rebuilds the full prompt app.py sends on each loop iteration (system
+# prompt, tool schemas, user message, assistant tool calls and tool results)
+# for a few benchmark queries, and counts its tokens with the old
+# sentence-style results versus the compact encoding from mcp_tools.results.
+# The model is assumed to request every tool in the first iteration and
+# answer in the second, which is what o4-mini does for these queries.
+#
+#   python bench_tokens.py > bench_output.txt
+
+import json
+import os
+import sys
+from datetime import datetime
+
+from app import SYSTEM_PROMPT
+from mcp_tools.tools import tools, execute_tool
+from mcp_tools.results import encode_tool_result, to_compact_json
+
+# tiktoken is optional and needs network access the first time it loads
+try:
+    import tiktoken
+    encoding = tiktoken.get_encoding("o200k_base")
+    TOKENIZER = "tiktoken o200k_base"
+except Exception:
+    encoding = None
+    TOKENIZER = "ESTIMATE ONLY, chars / 4 (tiktoken unavailable)"
+
+def count_tokens(text):
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Rough fallback: about four characters per token for English text
+    return (len(text) + 3) // 4
+
+def count_prompt_tokens(messages):
+    """Prompt tokens for a chat request, using OpenAI's per-message accounting."""
+    total = count_tokens(to_compact_json(tools)) + 3  # tool schemas + reply priming
+    for message in messages:
+        total += 3
+        for key, value in message.items():
+            total += count_tokens(value if isinstance(value, str) else to_compact_json(value))
+    return total
+
+def build_prompts(query, calls, results, render):
+    """Messages sent on loop iterations 1 and 2 for a query, with `render` for tool results."""
+    first = [
+        {"role": "developer", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": query},
+    ]
+    tool_calls = [
+        {"id": f"call_{i}", "type": "function",
+         "function": {"name": name, "arguments": json.dumps(args)}}
+        for i, (name, args) in enumerate(calls)
+    ]
+    second = first + [{"role": "assistant", "content": None, "tool_calls": tool_calls}]
+    for i, ((name, args), result) in enumerate(zip(calls, results)):
+        second.append({"tool_call_id": f"call_{i}", "role": "tool", "name": name,
+                       "content": render(name, args, result)})
+    return [first, second]
+
+# Benchmark queries with the tool calls the model typically makes for them
+BENCHMARK_QUERIES = [
+    (
+        "What is the weather in San Francisco, CA? Also, what is the current price of Apple (AAPL) stock? "
+        "Additionally, find information on the latest news about the stock market. Finally, calculate the "
+        "monthly mortgage payment for a $500,000 loan with a 3.5% interest rate over 30 years.",
+        [
+            ("get_weather", {"location": "San Francisco, CA"}),
+            ("get_stock_price", {"ticker": "AAPL"}),
+            ("search_web", {"query": "latest stock market news"}),
+            ("calculate_mortgage", {"principal": 500000, "interest_rate": 3.5, "years": 30}),
+        ],
+    ),
+    (
+        "Compare MSFT, GOOGL and TSLA share prices.",
+        [
+            ("get_stock_price", {"ticker": "MSFT"}),
+            ("get_stock_price", {"ticker": "GOOGL"}),
+            ("get_stock_price", {"ticker": "TSLA"}),
+        ],
+    ),
+    (
+        "Find me a quick pasta recipe and tell me what 42 plus 7 is.",
+        [
+            ("search_web", {"query": "quick pasta recipe"}),
+            ("add_numbers", {"a": 42, "b": 7}),
+        ],
+    ),
+]
+
+def legacy_text(tool_name, tool_args, result):
+    """Render a result the way the tools did before structured results."""
+    if tool_name == "get_weather":
+        return f"The weather in {tool_args.get('location') or 'the default location'} is sunny and 75°F."
+    if tool_name == "get_stock_price":
+        return f"The current stock price of {result['ticker']} is ${result['price_usd']}"
+    if tool_name == "search_web":
+        lines = [f"Web search results for '{tool_args['query']}' as of {datetime.now().strftime('%B %d, %Y')}:"]
+        lines += [f"{i}. {item}" for i, item in enumerate(result["results"], 1)]
+        return "\n".join(lines)
+    if tool_name == "calculate_mortgage":
+        return (f"For a ${result['principal']:,.2f} mortgage with {result['interest_rate']}% interest over "
+                f"{result['years']} years, your monthly payment would be ${result['monthly_payment']:.2f}")
+    return str(result)
+
+def main():
+    print(f"Tokenizer: {TOKENIZER}")
+    total_before = total_after = 0
+
+    for i, (query, calls) in enumerate(BENCHMARK_QUERIES, 1):
+        # Silence the tools' own [TOOL] logging
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            results = [execute_tool(name, args) for name, args in calls]
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        before = build_prompts(query, calls, results, legacy_text)
+        after = build_prompts(query, calls, results, lambda name, args, result: encode_tool_result(name, result))
+
+        print(f"[{i}] {query[:60]}...")
+        for iteration, (old, new) in enumerate(zip(before, after), 1):
+            old_tokens, new_tokens = count_prompt_tokens(old), count_prompt_tokens(new)
+            print(f"    loop {iteration} prompt tokens: {old_tokens} -> {new_tokens}")
+            total_before += old_tokens
+            total_after += new_tokens
+
+    print(f"Total prompt tokens over all loop iterations: {total_before} -> {total_after} "
+          f"({100 * (total_before - total_after) / total_before:.1f}% smaller)")
+    if encoding is None:
+        print("NOTE: counts are a chars/4 estimate; install tiktoken (with network access once) for real token counts")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Tools, agents and serving helpers shared by the playground apps.
+
+Submodules are imported on demand; importing this package does not pull in
+openai, agents, httpx or dotenv.
+"""
@@ -0,0 +1,196 @@
+import functools
+import inspect
+import json
+import threading
+import time
+
+from mcp_tools import tools
+from mcp_tools.tracing import current_trace
+from mcp_tools.config import load_env
+from mcp_tools.results import encode_tool_result, is_error_result
+
+# Agent registry
+# Agents are built once per process on first use (or up front by the prefork
+# parent) instead of at import time in every app. The openai-agents SDK is
+# only imported when the registry is built.
+
+_agents = None
+_lock = threading.Lock()
+
+# Model provider used for every run; None means the SDK default. The replay
+# tool swaps in a provider that serves recorded responses.
+model_provider = None
+
+UTILITY_INSTRUCTIONS = """
+You are an AI assistant with access to numerical, finance, web‑search, and
+weather tools. Analyse the user request, decide which tool(s)
+help, call them, then reply concisely.
+"""
+
+UTILITY_HANDOFF_INSTRUCTIONS = """
+You are an AI assistant with access to numerical, finance, web-search, and
+weather tools. Analyze the user request, decide which tool(s)
+help, call them, then reply concisely.
+
+If the user asks for detailed financial advice or complex financial calculations,
+hand off to the Financial Specialist.
+
+If the user speaks Spanish, hand off to the Spanish-speaking assistant.
+"""
+
+FINANCE_INSTRUCTIONS = """
+You are a specialized financial advisor AI with expertise in stocks,
+investments, mortgages, and financial planning. Provide detailed, accurate
+financial advice using available tools. Be precise and professional.
+"""
+
+SPANISH_INSTRUCTIONS = """
+Eres un asistente AI que habla español y tiene acceso a herramientas numéricas,
+financieras, de búsqueda web y del clima. Analiza la solicitud del usuario,
+decide qué herramienta(s) ayuda(n), llámalas y luego responde de manera concisa.
+"""
+
+def as_agent_tool(func):
+    """Wrap a plain tool function as an agent tool returning its encoded result."""
+    from agents import function_tool
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        trace = current_trace()
+        if trace is not None:
+            # The SDK passes arguments positionally, so name them from the signature
+            tool_args = dict(signature.bind(*args, **kwargs).arguments)
+            trace.tool_call(func.__name__, tool_args, result, 1000 * (time.perf_counter() - started))
+        return encode_tool_result(func.__name__, result)
+
+    return function_tool(wrapper)
+
+# ── Handoff filters ─────────────────────────────────────────────────────────
+def finance_handoff_filter(handoff_data):
+    # We could choose to filter history or modify the messages here
+    print("[HANDOFF] Finance handoff filter called")
+    return handoff_data
+
+def spanish_handoff_filter(handoff_data):
+    # Remove tool-related messages for simplicity
+    from agents.extensions import handoff_filters
+
+    print("[HANDOFF] Spanish handoff filter called")
+    return handoff_filters.remove_all_tools(handoff_data)
+
+def build_agents():
+    """Build every agent once and return them by name."""
+    global _agents
+    if _agents is not None:
+        return _agents
+
+    with _lock:
+        if _agents is not None:
+            return _agents
+
+        load_env()
+        from agents import Agent, ModelSettings, handoff
+
+        add_numbers = as_agent_tool(tools.add_numbers)
+        get_weather = as_agent_tool(tools.get_weather)
+        get_stock_price = as_agent_tool(tools.get_stock_price)
+        search_web = as_agent_tool(tools.search_web)
+        calculate_mortgage = as_agent_tool(tools.calculate_mortgage)
+        utility_tools = [add_numbers, get_weather, get_stock_price, search_web, calculate_mortgage]
+
+        finance_agent = Agent(
+            name="FinancialSpecialist",
+            instructions=FINANCE_INSTRUCTIONS,
+            model="o4-mini",
+            model_settings=ModelSettings(tool_choice="auto"),
+            tools=[get_stock_price, calculate_mortgage],
+            handoff_description="A financial specialist for complex financial queries.",
+        )
+
+        spanish_agent = Agent(
+            name="SpanishAssistant",
+            instructions=SPANISH_INSTRUCTIONS,
+            model="o4-mini",
+            model_settings=ModelSettings(tool_choice="auto"),
+            tools=utility_tools,
+            handoff_description="A Spanish-speaking assistant for Spanish language queries.",
+        )
+
+        _agents = {
+            # Single-agent assistant used by app_agents.py
+            "utility": Agent(
+                name="UtilityAssistant",
+                instructions=UTILITY_INSTRUCTIONS,
+                model="o4-mini",
+                model_settings=ModelSettings(tool_choice="auto"),
+                tools=utility_tools,
+            ),
+            # Primary agent for app_agents_handoffs.py
+            "utility_with_handoffs": Agent(
+                name="UtilityAssistant",
+                instructions=UTILITY_HANDOFF_INSTRUCTIONS,
+                model="o4-mini",
+                model_settings=ModelSettings(tool_choice="auto"),
+                tools=utility_tools,
+                handoffs=[
+                    handoff(finance_agent, input_filter=finance_handoff_filter),
+                    handoff(spanish_agent, input_filter=spanish_handoff_filter),
+                ],
+            ),
+            "finance": finance_agent,
+            "spanish": spanish_agent,
+        }
+    return _agents
+
+def get_agent(name):
+    """Return a prebuilt agent by name."""
+    return build_agents()[name]
+
+def tool_schemas(name):
+    """Name and parameter schema of each tool on the named agent."""
+    return [{"name": tool.name, "parameters": tool.params_json_schema} for tool in get_agent(name).tools]
+
+def tools_used(result):
+    """Names of the function tools called during a run."""
+    from agents.items import ToolCallItem
+
+    return [item.raw_item.name for item in result.new_items
+            if isinstance(item, ToolCallItem) and hasattr(item.raw_item, "name")]
+
+def tools_failed(result):
+    """True if any tool called during a run returned an error result."""
+    from agents.items import ToolCallOutputItem
+
+    for item in result.new_items:
+        if not isinstance(item, ToolCallOutputItem) or not isinstance(item.output, str):
+            continue
+        try:
+            if is_error_result(json.loads(item.output)):
+                return True
+        except ValueError:
+            continue
+    return False
+
+def run_sync(name, agent_input):
+    """Run the named agent to completion and return the RunResult.
+
+    When the current request is being traced, model calls and handoffs are
+    recorded on the trace as well.
+    """
+    from agents import Runner, RunConfig, OpenAIProvider
+
+    provider = model_provider or OpenAIProvider()
+    hooks = None
+    trace = current_trace()
+    if trace is not None and trace.sampled:
+        from mcp_tools.agent_tracing import RecordingModelProvider, TraceHooks
+
+        provider = RecordingModelProvider(provider, trace)
+        hooks = TraceHooks(trace)
+
+    return Runner.run_sync(get_agent(name), agent_input, hooks=hooks,
+                           run_config=RunConfig(model_provider=provider))
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from agents import RunHooks
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputItem
+from pydantic import TypeAdapter
+
+# Trace recording and replay for the openai-agents apps
+# Imported by mcp_tools.agent_registry only when a run is traced or replayed,
+# so untraced requests never load it.
+
+output_item_adapter = TypeAdapter(ResponseOutputItem)
+
+class RecordingModel(Model):
+    """Pass calls through to a real model and record each request/response."""
+
+    def __init__(self, inner, model_name, trace):
+        self.inner = inner
+        self.model_name = model_name
+        self.trace = trace
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *, previous_response_id):
+        request = {
+            "model": self.model_name,
+            "system_instructions": system_instructions,
+            "input": input if isinstance(input, str) else list(input),
+            "tools": [tool.name for tool in tools],
+            "handoffs": [h.tool_name for h in handoffs],
+        }
+        started = time.perf_counter()
+        response = await self.inner.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id,
+        )
+        self.trace.model_call(
+            "responses",
+            request,
+            {
+                "output": [item.model_dump() for item in response.output],
+                "usage": vars(response.usage),
+                "response_id": response.response_id,
+            },
+            1000 * (time.perf_counter() - started),
+        )
+        return response
+
+    def stream_response(self, *args, **kwargs):
+        # The apps never stream; streamed runs are passed through unrecorded
+        return self.inner.stream_response(*args, **kwargs)
+
+class RecordingModelProvider(ModelProvider):
+    def __init__(self, inner, trace):
+        self.inner = inner
+        self.trace = trace
+
+    def get_model(self, model_name):
+        return RecordingModel(self.inner.get_model(model_name), model_name, self.trace)
+
+class TraceHooks(RunHooks):
+    """Record handoffs between agents on the current trace."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        self.trace.handoff(from_agent.name, to_agent.name)
+
+class ReplayModel(Model):
+    """Serve model responses recorded in a trace, in order, without network access."""
+
+    def __init__(self, provider, model_name):
+        self.provider = provider
+        self.model_name = model_name
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *, previous_response_id):
+        event = self.provider.next_event()
+        if self.provider.model_latency:
+            await asyncio.sleep(event["duration_ms"] / 1000)
+
+        recorded = event["response"]
+        return ModelResponse(
+            output=[output_item_adapter.validate_python(item) for item in recorded["output"]],
+            usage=Usage(**recorded.get("usage", {})),
+            response_id=recorded.get("response_id"),
+        )
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("Streaming runs cannot be replayed")
+
+class ReplayModelProvider(ModelProvider):
+    def __init__(self, events, model_latency=False):
+        self.events = list(events)
+        self.model_latency = model_latency
+        self.served = 0
+
+    def next_event(self):
+        if self.served >= len(self.events):
+            raise RuntimeError(f"Trace has no more recorded model responses (served {self.served})")
+        event = self.events[self.served]
+        self.served += 1
+        return event
+
+    def get_model(self, model_name):
+        return ReplayModel(self, model_name)
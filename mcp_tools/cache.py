@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from mcp_tools.config import load_env
+
+# /chat response cache
+# Keyed on the normalized message, the model and a hash of the tool set, so a
+# schema change invalidates old entries. Each entry lives as long as the most
+# volatile tool used to produce it allows. Entries are kept in a bounded LRU
+# in memory and, when CACHE_DIR is set, as JSON files shared by all workers.
+# The disk tier is swept from `set` at most once per sweep interval: expired
+# files are removed first, then the oldest written until it is within bounds.
+#
+#   CACHE_MAX_ENTRIES           in-memory entries per process (default 1024, 0 disables caching)
+#   CACHE_DIR                   directory for the on-disk tier (default: no disk tier)
+#   CACHE_DISK_MAX_ENTRIES      files kept in CACHE_DIR (default 10000)
+#   CACHE_DISK_MAX_BYTES        total size of CACHE_DIR files (default 100 MB)
+#   CACHE_DISK_SWEEP_INTERVAL   seconds between sweeps per process (default 60)
+#   CACHE_NO_TOOL_TTL           TTL in seconds for answers that used no tools (default 3600)
+
+# Seconds a result stays fresh, by tool; None never expires
+TOOL_TTLS = {
+    "get_current_time": 15,
+    "convert_time": 3600,
+    "get_stock_price": 60,
+    "get_weather": 600,
+    "search_web": 3600,
+    "add_numbers": None,
+    "calculate_mortgage": None,
+}
+UNKNOWN_TOOL_TTL = 60
+
+_cache = None
+_lock = threading.Lock()
+
+def normalize_message(message):
+    """Collapse case, whitespace and trailing punctuation so trivial variants share a key."""
+    text = re.sub(r"\s+", " ", message).strip().casefold()
+    return text.rstrip("?!. ")
+
+def toolset_version(tool_schemas):
+    """Short hash of the tool schemas; changes whenever a tool is added or edited."""
+    encoded = json.dumps(tool_schemas, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:12]
+
+def cache_key(scope, message, model, tool_version):
+    """Cache key for a message sent to `scope` (the app or agent answering it)."""
+    parts = [scope, model, tool_version, normalize_message(message)]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+def ttl_for_tools(tool_names):
+    """TTL for a response built from these tools: the shortest of their TTLs."""
+    if not tool_names:
+        return float(os.getenv("CACHE_NO_TOOL_TTL", "3600"))
+
+    ttls = [TOOL_TTLS.get(name, UNKNOWN_TOOL_TTL) for name in set(tool_names)]
+    finite = [ttl for ttl in ttls if ttl is not None]
+    return min(finite) if finite else None
+
+def parse_cache_control(value):
+    """Return the set of directives in a Cache-Control style value."""
+    return {part.strip().lower() for part in (value or "").split(",") if part.strip()}
+
+class ResponseCache:
+    """Bounded in-memory LRU with an optional on-disk tier."""
+
+    def __init__(self, max_entries=1024, directory=None, disk_max_entries=10000,
+                 disk_max_bytes=100 * 1024 * 1024, sweep_interval=60):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.sweep_interval = sweep_interval
+        self.last_sweep = 0.0
+        self.entries = OrderedDict()  # key -> (expires_at or None, value)
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "disk_removed": 0}
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self.disk_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["expires_at"], entry["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def remove_disk(self, key):
+        try:
+            os.remove(self.disk_path(key))
+        except OSError:
+            pass
+
+    def write_disk(self, key, expires_at, value):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so other workers never read a partial file
+            tmp_path = f"{self.disk_path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.disk_path(key))
+        except OSError as e:
+            print(f"[CACHE] Failed to write disk entry: {e}")
+
+    def sweep_disk(self):
+        """Remove expired disk entries, then the oldest until within the disk bounds."""
+        if not self.directory:
+            return 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+
+        now = time.time()
+        kept = []  # (mtime, size, path)
+        expired = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if name.endswith(".tmp"):
+                    # Left behind by a worker that died mid-write
+                    if stat.st_mtime < now - 60:
+                        expired.append(path)
+                    continue
+                if not name.endswith(".json"):
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    expires_at = json.load(f)["expires_at"]
+            except OSError:
+                # Removed by another worker since listdir
+                continue
+            except (ValueError, KeyError):
+                expired.append(path)
+                continue
+            if expires_at is not None and expires_at <= now:
+                expired.append(path)
+            else:
+                kept.append((stat.st_mtime, stat.st_size, path))
+
+        kept.sort()
+        total_bytes = sum(size for _, size, _ in kept)
+        oldest = 0
+        while oldest < len(kept) and (len(kept) - oldest > self.disk_max_entries
+                                      or total_bytes > self.disk_max_bytes):
+            total_bytes -= kept[oldest][1]
+            expired.append(kept[oldest][2])
+            oldest += 1
+
+        removed = 0
+        for path in expired:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            with self.lock:
+                self.stats["disk_removed"] += removed
+            print(f"[CACHE] Swept {removed} disk entr{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self.entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self.entries[key]
+
+        entry = self.read_disk(key)
+        if entry is not None and entry[0] is not None and entry[0] <= now:
+            self.remove_disk(key)
+            entry = None
+
+        with self.lock:
+            if entry is not None:
+                self.store_in_memory(key, entry)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+        return None
+
+    def store_in_memory(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def set(self, key, value, ttl):
+        """Store value for ttl seconds (forever if ttl is None)."""
+        expires_at = None if ttl is None else time.time() + ttl
+        with self.lock:
+            self.store_in_memory(key, (expires_at, value))
+            self.stats["stores"] += 1
+            sweep = self.directory and time.time() - self.last_sweep >= self.sweep_interval
+            if sweep:
+                self.last_sweep = time.time()
+        self.write_disk(key, expires_at, value)
+        if sweep:
+            self.sweep_disk()
+
+def get_cache():
+    """The process-wide response cache, or None when caching is disabled."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                load_env()
+                max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+                _cache = ResponseCache(
+                    max_entries,
+                    os.getenv("CACHE_DIR") or None,
+                    disk_max_entries=int(os.getenv("CACHE_DISK_MAX_ENTRIES", "10000")),
+                    disk_max_bytes=int(os.getenv("CACHE_DISK_MAX_BYTES", str(100 * 1024 * 1024))),
+                    sweep_interval=float(os.getenv("CACHE_DISK_SWEEP_INTERVAL", "60")),
+                ) if max_entries > 0 else False
+    return _cache or None
@@ -0,0 +1,42 @@
+import os
+import threading
+
+# Environment and client setup
+# dotenv and openai are only imported on first use, so apps that never reach
+# them (or the prefork parent before preload) don't pay for the import.
+
+_env_loaded = False
+_client = None
+_lock = threading.Lock()
+
+def load_env():
+    """Load variables from .env once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
+
+def get_openai_client():
+    """Return the shared OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                load_env()
+                from openai import OpenAI
+
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+def set_openai_client(client):
+    """Replace the shared client, e.g. with one that replays recorded responses.
+
+    Returns the previous client (None if none was created yet) so it can be restored.
+    """
+    global _client
+    with _lock:
+        previous, _client = _client, client
+    return previous
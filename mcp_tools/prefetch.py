@@ -0,0 +1,136 @@
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_tools.tools import execute_tool
+
+# Speculative tool prefetch
+# While the first model call is in flight we run the tool calls that are
+# obvious from the user's text (tickers, "weather in X", IANA timezones).
+# Only read-only tools are prefetched; a later tool call with identical
+# arguments is answered from the prefetched result.
+PREFETCH_MAX_CALLS = 8
+
+prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+# wasted: never asked for (cancelled: of those, never ran)
+# late: asked for but still queued, so the tool ran inline instead
+prefetch_stats = {"started": 0, "hits": 0, "wasted": 0, "cancelled": 0, "late": 0}
+prefetch_stats_lock = threading.Lock()
+
+KNOWN_TICKERS = {"AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA"}
+COMPANY_TICKERS = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "amazon": "AMZN",
+    "meta": "META",
+    "tesla": "TSLA",
+}
+
+TICKER_IN_PARENS_RE = re.compile(r"\(\$?([A-Z]{1,5})\)")
+TICKER_DOLLAR_RE = re.compile(r"\$([A-Z]{1,5})\b")
+UPPERCASE_WORD_RE = re.compile(r"\b([A-Z]{2,5})\b")
+WEATHER_RE = re.compile(r"weather\s+(?:like\s+)?in\s+([A-Za-z .'-]+?(?:,\s*[A-Z]{2})?)(?=[?.!;]|\s+(?:and|also|today|tomorrow|right now)\b|$)", re.IGNORECASE)
+TIMEZONE_RE = re.compile(r"\b((?:Africa|America|Antarctica|Asia|Atlantic|Australia|Europe|Indian|Pacific)/[A-Za-z_]+(?:/[A-Za-z_]+)?)\b")
+
+def prefetch_key(tool_name, tool_args):
+    """Build a lookup key for a tool call from its name and arguments."""
+    normalized = {k: v.strip() if isinstance(v, str) else v for k, v in tool_args.items()}
+    return (tool_name, json.dumps(normalized, sort_keys=True))
+
+def extract_prefetch_calls(message):
+    """Guess likely tool calls from the user's message with cheap local parsing."""
+    calls = []
+
+    # Stock tickers: "(AAPL)", "$MSFT", known symbols and company names.
+    # Unknown symbols only count in a stock question, so "(USA)" or "(UTC)"
+    # in other messages are not mistaken for tickers.
+    tickers = []
+    stock_question = "stock" in message.lower() or "share" in message.lower()
+    candidates = [word for word in TICKER_IN_PARENS_RE.findall(message) + TICKER_DOLLAR_RE.findall(message)
+                  if stock_question or word in KNOWN_TICKERS]
+    candidates += [word for word in UPPERCASE_WORD_RE.findall(message) if word in KNOWN_TICKERS]
+    if stock_question:
+        for word in re.findall(r"[a-z]+", message.lower()):
+            if word in COMPANY_TICKERS:
+                candidates.append(COMPANY_TICKERS[word])
+    for ticker in candidates:
+        if ticker not in tickers:
+            tickers.append(ticker)
+    calls += [("get_stock_price", {"ticker": ticker}) for ticker in tickers]
+
+    # Weather: "weather in San Francisco, CA"
+    for location in WEATHER_RE.findall(message):
+        location = location.strip()
+        if location:
+            calls.append(("get_weather", {"location": location}))
+
+    # Timezones: only a plain "time in <zone>" lookup, conversions need a time
+    if "time" in message.lower():
+        for timezone in dict.fromkeys(TIMEZONE_RE.findall(message)):
+            calls.append(("get_current_time", {"timezone": timezone}))
+
+    return calls[:PREFETCH_MAX_CALLS]
+
+def start_prefetch(message):
+    """Submit speculative tool calls in the background and return their futures by key."""
+    # Read per call so a TOOL_PREFETCH set in .env is honoured
+    if os.getenv("TOOL_PREFETCH", "1") == "0":
+        return {}
+
+    futures = {}
+    for tool_name, tool_args in extract_prefetch_calls(message):
+        key = prefetch_key(tool_name, tool_args)
+        if key in futures:
+            continue
+        print(f"[PREFETCH] Starting {tool_name} with args: {tool_args}")
+        futures[key] = prefetch_executor.submit(execute_tool, tool_name, tool_args)
+
+    with prefetch_stats_lock:
+        prefetch_stats["started"] += len(futures)
+    return futures
+
+def take_prefetched(futures, tool_name, tool_args):
+    """Return (True, result) if a matching prefetch exists, else (False, None)."""
+    future = futures.pop(prefetch_key(tool_name, tool_args), None)
+    if future is None:
+        return False, None
+
+    # Still queued behind other requests' prefetches: running the tool inline
+    # is never slower than waiting for a worker thread to free up
+    if future.cancel():
+        print(f"[PREFETCH] {tool_name} prefetch not started yet, executing normally")
+        with prefetch_stats_lock:
+            prefetch_stats["late"] += 1
+        return False, None
+
+    try:
+        result = future.result()
+    except Exception as e:
+        # A failed prefetch falls back to the regular tool path
+        print(f"[PREFETCH] {tool_name} prefetch failed, executing normally: {e}")
+        with prefetch_stats_lock:
+            prefetch_stats["wasted"] += 1
+        return False, None
+
+    with prefetch_stats_lock:
+        prefetch_stats["hits"] += 1
+    print(f"[PREFETCH] Hit for {tool_name} with args: {tool_args}")
+    return True, result
+
+def discard_prefetch(futures):
+    """Cancel prefetches the model never asked for and count them as wasted."""
+    if not futures:
+        return
+
+    cancelled = sum(1 for future in futures.values() if future.cancel())
+    with prefetch_stats_lock:
+        prefetch_stats["wasted"] += len(futures)
+        prefetch_stats["cancelled"] += cancelled
+        stats = dict(prefetch_stats)
+    print(f"[PREFETCH] Discarded {len(futures)} unused prefetch(es) ({cancelled} cancelled before running). Totals: {stats}")
+    futures.clear()
+
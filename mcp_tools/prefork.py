@@ -0,0 +1,222 @@
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from mcp_tools.config import load_env, get_openai_client
+
+# Prefork server
+# The parent imports the app, loads openai/httpx/agents and builds the tool
+# registry and agents once, then forks workers that share that memory
+# copy-on-write and accept on the same listening socket.
+#
+#   python -m mcp_tools.prefork app:app --workers 4 --port 5000
+
+# A worker that exits within WORKER_MIN_UPTIME seconds of being forked is
+# restarted after an exponential backoff; after MAX_QUICK_FAILURES such exits
+# in a row the server gives up instead of fork-looping.
+WORKER_MIN_UPTIME = 5
+MAX_QUICK_FAILURES = 5
+MAX_RESTART_DELAY = 30
+
+def rss_mb(pid="self"):
+    """Resident set size of a process in MB, from /proc when available."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # Peak RSS is the best we can do without /proc (KB on Linux, bytes on macOS)
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def private_mb(pid="self"):
+    """Memory private to a process in MB (not shared copy-on-write), or None."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith("Private_")) / 1024
+    except OSError:
+        return None
+
+def load_app(target):
+    """Import a "module:attribute" target and return the WSGI app."""
+    module_name, _, attr = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr or "app")
+
+def preload(uses_agents):
+    """Import heavy dependencies and build shared state before forking.
+
+    Agents are only built for apps that use mcp_tools.agent_registry, since
+    importing the SDK also starts its trace export thread.
+    """
+    load_env()
+
+    import httpx  # noqa: F401 -- used by the time tools
+    from mcp_tools import tools, prefetch  # noqa: F401
+
+    try:
+        get_openai_client()
+    except Exception as e:
+        print(f"[PREFORK] OpenAI client not created in parent: {e}")
+
+    if not uses_agents:
+        return
+    try:
+        from mcp_tools import agent_registry
+
+        agents = agent_registry.build_agents()
+        print(f"[PREFORK] Built {len(agents)} agents")
+    except ImportError as e:
+        print(f"[PREFORK] Skipping agents: {e}")
+
+def restart_agents_tracing():
+    """Give a forked worker its own agents SDK trace exporter.
+
+    The SDK's BatchTraceProcessor exports from a background thread started in
+    the parent; threads don't survive fork, so without this a worker would
+    queue spans that are never sent.
+    """
+    if "agents" not in sys.modules:
+        return
+    from agents import set_trace_processors
+    from agents.tracing.processors import BackendSpanExporter, BatchTraceProcessor
+
+    set_trace_processors([BatchTraceProcessor(BackendSpanExporter())])
+
+def run_worker(app, sock, host, worker_id):
+    """Serve requests on the inherited socket until the process is killed."""
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    restart_agents_tracing()
+
+    server = make_server(host, 0, app, threaded=True, fd=sock.fileno())
+    private = private_mb()
+    private_info = f", private {private:.1f} MB" if private is not None else ""
+    print(f"[WORKER {worker_id}] pid {os.getpid()} ready, RSS {rss_mb():.1f} MB{private_info}")
+    server.serve_forever()
+
+def spawn_worker(app, sock, host, worker_id):
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            run_worker(app, sock, host, worker_id)
+        except Exception:
+            print(f"[WORKER {worker_id}] pid {os.getpid()} failed:")
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+    return pid
+
+def restart_delay(quick_failures):
+    """Seconds to wait before restarting a worker after its Nth quick exit in a row."""
+    if quick_failures == 0:
+        return 0
+    return min(0.5 * 2 ** (quick_failures - 1), MAX_RESTART_DELAY)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a Flask app with preforked workers.")
+    parser.add_argument("target", nargs="?", default="app:app", help="WSGI app as module:attribute")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    app = load_app(args.target)
+    imported = time.perf_counter()
+    preload(uses_agents="mcp_tools.agent_registry" in sys.modules)
+    preloaded = time.perf_counter()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    # Move everything allocated so far out of the GC's reach so collections in
+    # the workers don't touch (and un-share) the parent's pages
+    gc.collect()
+    gc.freeze()
+
+    print(f"[PREFORK] Startup {1000 * (preloaded - started):.0f} ms "
+          f"(import {1000 * (imported - started):.0f} ms, preload {1000 * (preloaded - imported):.0f} ms), "
+          f"parent RSS {rss_mb():.1f} MB")
+    print(f"[PREFORK] Serving {args.target} on http://{args.host}:{args.port} with {args.workers} workers")
+
+    workers = {}  # pid -> (worker_id, forked_at)
+    for worker_id in range(args.workers):
+        workers[spawn_worker(app, sock, args.host, worker_id)] = (worker_id, time.monotonic())
+
+    shutting_down = False
+    exit_status = 0
+    quick_failures = {}  # worker_id -> quick exits in a row
+
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    # Reap workers and replace any that die unexpectedly
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        worker = workers.pop(pid, None)
+        if worker is None or shutting_down:
+            continue
+
+        worker_id, forked_at = worker
+        exit_code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - forked_at < WORKER_MIN_UPTIME:
+            quick_failures[worker_id] = quick_failures.get(worker_id, 0) + 1
+        else:
+            quick_failures[worker_id] = 0
+
+        if quick_failures[worker_id] >= MAX_QUICK_FAILURES:
+            print(f"[PREFORK] Worker {worker_id} (pid {pid}) exited with status {exit_code} "
+                  f"{quick_failures[worker_id]} times in a row right after starting, giving up")
+            exit_status = 1
+            shutdown(None, None)
+            continue
+
+        delay = restart_delay(quick_failures[worker_id])
+        print(f"[PREFORK] Worker {worker_id} (pid {pid}) exited with status {exit_code}, "
+              f"restarting" + (f" in {delay:.1f} s" if delay else ""))
+        time.sleep(delay)
+        if not shutting_down:
+            workers[spawn_worker(app, sock, args.host, worker_id)] = (worker_id, time.monotonic())
+
+    sock.close()
+    print("[PREFORK] All workers stopped")
+    if exit_status:
+        sys.exit(exit_status)
+
+if __name__ == "__main__":
+    main()
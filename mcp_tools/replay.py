@@ -0,0 +1,185 @@
+import argparse
+import contextlib
+import cProfile
+import importlib
+import io
+import json
+import pstats
+import statistics
+import time
+from types import SimpleNamespace
+
+from mcp_tools import tracing
+from mcp_tools.config import set_openai_client
+
+# Trace replay
+# Re-runs recorded /chat traces against the current code. Model responses are
+# served from the trace, so no network access or API key is needed; tools run
+# for real, which makes the reasoning loop and tool path comparable offline.
+#
+#   python -m mcp_tools.replay 'traces/*.jsonl.gz' --repeat 5
+#   python -m mcp_tools.replay traces/trace-1234.jsonl.gz --trace-id <id> --profile
+
+class ReplayCompletions:
+    def __init__(self, events, model_latency=False):
+        self.events = list(events)
+        self.model_latency = model_latency
+        self.served = 0
+
+    def create(self, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        if self.served >= len(self.events):
+            raise RuntimeError(f"Trace has no more recorded model responses (served {self.served})")
+        event = self.events[self.served]
+        self.served += 1
+        if self.model_latency:
+            time.sleep(event["duration_ms"] / 1000)
+        return ChatCompletion.model_validate(event["response"])
+
+class ReplayClient:
+    """Stands in for the OpenAI client in app.py, answering from a trace."""
+
+    def __init__(self, events, model_latency=False):
+        self.chat = SimpleNamespace(completions=ReplayCompletions(events, model_latency))
+
+def install_replay(record, model_latency=False):
+    """Point the apps' model calls at the responses recorded in `record`.
+
+    Both a replay client and a replay model provider are installed, even when
+    the trace has no model events for them, so a replay can never fall
+    through to a real model or to the previous trace's responses. Returns a
+    function that restores what was installed before.
+    """
+    from agents import set_tracing_disabled
+    from mcp_tools import agent_registry
+    from mcp_tools.agent_tracing import ReplayModelProvider
+
+    # The SDK's own trace export would need the network
+    set_tracing_disabled(True)
+
+    events = [e for e in record["events"] if e["type"] == "model"]
+    previous_client = set_openai_client(
+        ReplayClient([e for e in events if e["api"] == "chat.completions"], model_latency)
+    )
+    previous_provider = agent_registry.model_provider
+    agent_registry.model_provider = ReplayModelProvider(
+        [e for e in events if e["api"] == "responses"], model_latency
+    )
+
+    def restore():
+        set_openai_client(previous_client)
+        agent_registry.model_provider = previous_provider
+
+    return restore
+
+def summarize(record):
+    events = record.get("events", [])
+    models = [e for e in events if e["type"] == "model"]
+    tools = [e for e in events if e["type"] == "tool"]
+    return {
+        "duration_ms": record.get("duration_ms", 0),
+        "model_calls": len(models),
+        "model_ms": sum(e["duration_ms"] for e in models),
+        "tool_calls": [e["name"] for e in tools],
+        "tool_args": sorted(json.dumps([e["name"], e.get("args")], sort_keys=True) for e in tools),
+        "tool_ms": sum(e["duration_ms"] for e in tools),
+        "handoffs": [e["to_agent"] for e in events if e["type"] == "handoff"],
+    }
+
+def replay_once(record, collector, model_latency=False, quiet=True):
+    """Replay one trace through its app's /chat route and return the new trace."""
+    module = importlib.import_module(record["app"])
+    request = dict(record["request"])
+
+    # Restore the session the request originally saw
+    history = request.pop("history", None)
+    if history is not None and hasattr(module, "conversations"):
+        module.conversations[request.get("session_id", "default")] = list(history)
+
+    restore = install_replay(record, model_latency)
+    client = module.app.test_client()
+    recorded_before = len(collector.records)
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            # Never answer a replay from the response cache, nor fill it
+            response = client.post("/chat", json=request, headers={"Cache-Control": "no-store"})
+    finally:
+        restore()
+
+    replayed = collector.records[-1] if len(collector.records) > recorded_before else {"events": []}
+    replayed["status"] = response.status_code
+    return replayed
+
+def print_comparison(record, runs):
+    recorded = summarize(record)
+    replayed = [summarize(run) for run in runs]
+    last = replayed[-1]
+    total = statistics.median(r["duration_ms"] for r in replayed)
+    tool_ms = statistics.median(r["tool_ms"] for r in replayed)
+    model_ms = statistics.median(r["model_ms"] for r in replayed)
+
+    print(f"[REPLAY] {record['trace_id']} ({record['app']}): status {record.get('status')} -> {runs[-1].get('status')}")
+    print(f"    recorded: {recorded['duration_ms']:.1f} ms total, {recorded['model_calls']} model calls "
+          f"({recorded['model_ms']:.1f} ms), {len(recorded['tool_calls'])} tool calls ({recorded['tool_ms']:.1f} ms)")
+    print(f"    replayed: {total:.1f} ms total, {last['model_calls']} model calls ({model_ms:.1f} ms), "
+          f"{len(last['tool_calls'])} tool calls ({tool_ms:.1f} ms)"
+          + (f" [median of {len(runs)}]" if len(runs) > 1 else ""))
+
+    if sorted(recorded["tool_calls"]) != sorted(last["tool_calls"]):
+        print(f"    tool calls differ: recorded {recorded['tool_calls']}, replayed {last['tool_calls']}")
+    elif recorded["tool_args"] != last["tool_args"]:
+        print(f"    tool arguments differ: recorded {recorded['tool_args']}, replayed {last['tool_args']}")
+    if recorded["handoffs"] != last["handoffs"]:
+        print(f"    handoffs differ: recorded {recorded['handoffs']}, replayed {last['handoffs']}")
+    if record.get("response") != runs[-1].get("response"):
+        print("    response differs from the recorded one")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded /chat traces against the current code.")
+    parser.add_argument("paths", nargs="+", help="trace files (.jsonl or .jsonl.gz); globs are expanded")
+    parser.add_argument("--trace-id", help="only replay the trace with this id")
+    parser.add_argument("--repeat", type=int, default=1, help="replay each trace this many times")
+    parser.add_argument("--model-latency", action="store_true",
+                        help="sleep for each model call's recorded duration")
+    parser.add_argument("--profile", action="store_true", help="print cProfile stats for the replays")
+    parser.add_argument("--verbose", action="store_true", help="show the apps' own logging")
+    args = parser.parse_args(argv)
+
+    # Capture every replayed request in memory instead of writing it
+    collector = tracing.MemoryWriter()
+    tracing.configure(sample_rate=1.0, writer=collector)
+
+    profiler = cProfile.Profile() if args.profile else None
+    replayed = 0
+    cache_hits = []
+    for record in tracing.read_traces(args.paths):
+        if args.trace_id and record["trace_id"] != args.trace_id:
+            continue
+        # Answered from the response cache: no model or tool events to replay
+        if record.get("cache") == "hit":
+            cache_hits.append(record)
+            continue
+
+        runs = []
+        for _ in range(args.repeat):
+            if profiler:
+                profiler.enable()
+            try:
+                runs.append(replay_once(record, collector, args.model_latency, quiet=not args.verbose))
+            finally:
+                if profiler:
+                    profiler.disable()
+        print_comparison(record, runs)
+        replayed += 1
+
+    print(f"[REPLAY] Replayed {replayed} trace(s)")
+    if cache_hits:
+        hit_ms = statistics.median(r.get("duration_ms", 0) for r in cache_hits)
+        print(f"[REPLAY] Skipped {len(cache_hits)} cache-hit trace(s) (median {hit_ms:.1f} ms recorded)")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import json
+
+# Tool result encoding
+# Tools return plain structured values (dicts, lists, numbers) and this module
+# turns them into the smallest string we can hand back to the model. Every
+# tool message is resent on each later loop iteration, so a few saved tokens
+# here are saved many times over.
+
+DEFAULT_MAX_CHARS = 600
+TRUNCATION_MARKER = "…"
+MIN_STRING_CHARS = 8
+
+# tool name -> {"max_chars": int, "render": callable or None}
+result_formats = {}
+
+def result_format(max_chars=None, render=None):
+    """Declare how a tool's result is encoded.
+
+    `render` maps the raw result to a compact value (or string) before
+    serialization; `max_chars` caps the encoded size for this tool.
+    """
+    def decorator(func):
+        result_formats[func.__name__] = {
+            "max_chars": max_chars or DEFAULT_MAX_CHARS,
+            "render": render,
+        }
+        return func
+    return decorator
+
+def to_compact_json(value):
+    """Serialize a value to JSON without any optional whitespace."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+def truncate(text, max_chars):
+    """Cut plain text to max_chars, marking the cut so the model knows it is partial."""
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+
+def shrink_once(value):
+    """Make a JSON value smaller in place by one step; False if nothing is left to cut.
+
+    Trailing list items go first (the longest list loses its last item), then
+    the longest string is halved.
+    """
+    lists, strings = [], []
+
+    def walk(node, parent, key):
+        if isinstance(node, list):
+            if node:
+                lists.append(node)
+            for i, item in enumerate(node):
+                walk(item, node, i)
+        elif isinstance(node, dict):
+            for k, item in node.items():
+                walk(item, node, k)
+        elif isinstance(node, str) and len(node) > MIN_STRING_CHARS and parent is not None:
+            strings.append((parent, key, node))
+
+    walk(value, None, None)
+    if lists:
+        max(lists, key=len).pop()
+        return True
+    if strings:
+        parent, key, text = max(strings, key=lambda s: len(s[2]))
+        keep = max(MIN_STRING_CHARS, len(text) // 2)
+        parent[key] = text[:keep - len(TRUNCATION_MARKER)] + TRUNCATION_MARKER
+        return True
+    return False
+
+def shrink_to_fit(value, max_chars):
+    """Structurally shrink a value until its compact JSON fits in max_chars.
+
+    The result stays valid JSON and carries "truncated": true. Lists are
+    wrapped as {"items": [...], "truncated": true} so the flag has a home.
+    """
+    # Work on a plain-JSON copy so the tool's own value is never mutated
+    value = json.loads(to_compact_json(value))
+    shrunk = {"items": value} if isinstance(value, list) else value
+    if not isinstance(shrunk, dict):
+        shrunk = {"value": shrunk}
+    shrunk["truncated"] = True
+
+    while len(to_compact_json(shrunk)) > max_chars:
+        if not shrink_once(shrunk):
+            return to_compact_json({"truncated": True})
+    return to_compact_json(shrunk)
+
+def is_error_result(value):
+    """True for the {"error": ...} results tools return when they fail."""
+    return isinstance(value, dict) and "error" in value
+
+def encode_tool_result(tool_name, value):
+    """Encode a tool result as a compact string for a tool message."""
+    fmt = result_formats.get(tool_name, {})
+    render = fmt.get("render")
+    max_chars = fmt.get("max_chars", DEFAULT_MAX_CHARS)
+
+    if render is not None:
+        value = render(value)
+
+    # Plain strings go through untouched; quoting them would only add tokens
+    if isinstance(value, str):
+        return truncate(value, max_chars)
+
+    text = to_compact_json(value)
+    if len(text) <= max_chars:
+        return text
+    return shrink_to_fit(value, max_chars)
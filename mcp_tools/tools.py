@@ -0,0 +1,291 @@
+import os
+from datetime import datetime
+
+from mcp_tools.results import result_format
+
+# Shared MCP tools
+# Plain functions used by app.py directly and wrapped as agent tools by
+# mcp_tools.agent_registry. httpx is imported inside the time tools so that
+# importing this module stays cheap.
+
+# MCP Tool definitions
+def add_numbers(a: float, b: float):
+    """Add two numbers and return the result."""
+    print(f"[TOOL] add_numbers executed with args: a={a}, b={b}")
+    result = a + b
+    print(f"[TOOL] add_numbers result: {result}")
+    return result
+
+def get_weather(location: str | None = None):
+    """Get weather for a location (currently returns hardcoded response)."""
+    print(f"[TOOL] get_weather executed with location: {location if location else 'default'}")
+    result = {"location": location or "default", "conditions": "sunny", "temp_f": 75}
+    print(f"[TOOL] get_weather result: {result}")
+    return result
+
+def get_stock_price(ticker: str):
+    """Get the current stock price for a given ticker symbol."""
+    print(f"[TOOL] get_stock_price executed for ticker: {ticker}")
+    # Simulate different prices for different stocks
+    prices = {
+        "AAPL": 187.45,
+        "MSFT": 425.22,
+        "GOOGL": 175.33,
+        "AMZN": 182.87,
+        "META": 478.22,
+        "TSLA": 175.34,
+    }
+    price = prices.get(ticker.upper(), 100.00)  # Default price if ticker not found
+    result = {"ticker": ticker.upper(), "price_usd": price}
+    print(f"[TOOL] get_stock_price result: {result}")
+    return result
+
+@result_format(max_chars=400)
+def search_web(query: str):
+    """Simulates a web search and returns results."""
+    print(f"[TOOL] search_web executed with query: {query}")
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    
+    # Simulate different search results based on keywords
+    if "news" in query.lower():
+        results = [
+            "Latest headlines: Global markets rally as inflation eases",
+            "Tech industry sees surge in AI investments",
+            "New climate agreement reached at international summit",
+        ]
+    elif "recipe" in query.lower():
+        results = [
+            "Easy pasta carbonara recipe: Ready in 15 minutes",
+            "Healthy smoothie recipes for breakfast",
+            "The perfect chocolate chip cookie recipe",
+        ]
+    else:
+        results = [
+            "Top results for your search",
+            "Related information from reliable sources",
+            "Wikipedia entries related to your query",
+        ]
+    
+    result = {"date": current_date, "results": results}
+    print(f"[TOOL] search_web result: {result}")
+    return result
+
+@result_format(render=lambda r: {"monthly_payment": r["monthly_payment"]})
+def calculate_mortgage(principal: float, interest_rate: float, years: int):
+    """Calculate monthly mortgage payment."""
+    print(f"[TOOL] calculate_mortgage executed with args: principal={principal}, interest_rate={interest_rate}, years={years}")
+    
+    # Convert annual interest rate to monthly rate
+    monthly_rate = interest_rate / 100 / 12
+    # Total number of payments
+    payments = years * 12
+    
+    # Calculate monthly payment using the mortgage formula
+    if monthly_rate == 0:
+        # Edge case: if interest rate is 0, it's just the principal divided by months
+        monthly_payment = principal / payments
+    else:
+        monthly_payment = principal * (monthly_rate * (1 + monthly_rate) ** payments) / ((1 + monthly_rate) ** payments - 1)
+    
+    result = {
+        "principal": principal,
+        "interest_rate": interest_rate,
+        "years": years,
+        "monthly_payment": round(monthly_payment, 2),
+    }
+    print(f"[TOOL] calculate_mortgage result: {result}")
+    return result
+
+# MCP Time Tool functions
+def mcp_time_server_url():
+    """Base URL of the MCP time server, read when a time tool is called."""
+    return os.getenv("MCP_TIME_SERVER_URL", "http://localhost:8000")
+
+def get_current_time(timezone: str | None = None):
+    """Get the current time in a specific timezone or the system timezone."""
+    print(f"[TOOL] get_current_time executed with timezone: {timezone if timezone else 'system default'}")
+    
+    try:
+        import httpx
+
+        payload = {
+            "name": "get_current_time",
+            "arguments": {}
+        }
+        
+        if timezone:
+            payload["arguments"]["timezone"] = timezone
+        
+        response = httpx.post(f"{mcp_time_server_url()}/tool", json=payload, timeout=10.0)
+        response.raise_for_status()
+        result = response.json()
+        
+        formatted_result = {"timezone": result["timezone"], "datetime": result["datetime"], "is_dst": result["is_dst"]}
+        print(f"[TOOL] get_current_time result: {formatted_result}")
+        return formatted_result
+        
+    except Exception as e:
+        error_msg = f"Error getting current time: {str(e)}"
+        print(f"[TOOL] get_current_time error: {error_msg}")
+        return {"error": error_msg}
+
+def convert_time(source_timezone: str, time: str, target_timezone: str):
+    """Convert time between timezones."""
+    print(f"[TOOL] convert_time executed with args: source={source_timezone}, time={time}, target={target_timezone}")
+    
+    try:
+        import httpx
+
+        payload = {
+            "name": "convert_time",
+            "arguments": {
+                "source_timezone": source_timezone,
+                "time": time,
+                "target_timezone": target_timezone
+            }
+        }
+        
+        response = httpx.post(f"{mcp_time_server_url()}/tool", json=payload, timeout=10.0)
+        response.raise_for_status()
+        result = response.json()
+        
+        formatted_result = {"target_datetime": result["target"]["datetime"], "time_difference": result["time_difference"]}
+        print(f"[TOOL] convert_time result: {formatted_result}")
+        return formatted_result
+        
+    except Exception as e:
+        error_msg = f"Error converting time: {str(e)}"
+        print(f"[TOOL] convert_time error: {error_msg}")
+        return {"error": error_msg}
+
+# MCP Tool registry
+tools = [
+    {
+        "type": "function",
+        "function": {
+            "name": "add_numbers",
+            "description": "Add two numbers together",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "a": {"type": "number", "description": "The first number"},
+                    "b": {"type": "number", "description": "The second number"}
+                },
+                "required": ["a", "b"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Get the current weather in a location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {"type": "string", "description": "The city and state, e.g. San Francisco, CA"}
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_stock_price",
+            "description": "Get the current price of a stock by its ticker symbol",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "ticker": {"type": "string", "description": "The stock ticker symbol, e.g. AAPL for Apple"}
+                },
+                "required": ["ticker"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_web",
+            "description": "Search the web for information on a topic",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "The search query"}
+                },
+                "required": ["query"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "calculate_mortgage",
+            "description": "Calculate monthly mortgage payment based on principal, interest rate, and term",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "principal": {"type": "number", "description": "The mortgage principal amount in dollars"},
+                    "interest_rate": {"type": "number", "description": "Annual interest rate as a percentage (e.g., 5.5 for 5.5%)"},
+                    "years": {"type": "integer", "description": "The mortgage term in years"}
+                },
+                "required": ["principal", "interest_rate", "years"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_time",
+            "description": "Get the current time in a specific timezone using the MCP time server",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "timezone": {"type": "string", "description": "IANA timezone name (e.g., 'America/New_York', 'Europe/London'). If not provided, system timezone will be used."}
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "convert_time",
+            "description": "Convert time between timezones using the MCP time server",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "source_timezone": {"type": "string", "description": "Source IANA timezone name (e.g., 'America/New_York')"},
+                    "time": {"type": "string", "description": "Time in 24-hour format (HH:MM)"},
+                    "target_timezone": {"type": "string", "description": "Target IANA timezone name (e.g., 'Europe/London')"}
+                },
+                "required": ["source_timezone", "time", "target_timezone"]
+            }
+        }
+    }
+]
+
+# Tool dispatcher
+def execute_tool(tool_name, tool_args):
+    print(f"[DISPATCHER] Executing tool: {tool_name} with args: {tool_args}")
+    if tool_name == "add_numbers":
+        result = add_numbers(**tool_args)
+    elif tool_name == "get_weather":
+        result = get_weather(**tool_args)
+    elif tool_name == "get_stock_price":
+        result = get_stock_price(**tool_args)
+    elif tool_name == "search_web":
+        result = search_web(**tool_args)
+    elif tool_name == "calculate_mortgage":
+        result = calculate_mortgage(**tool_args)
+    elif tool_name == "get_current_time":
+        result = get_current_time(**tool_args)
+    elif tool_name == "convert_time":
+        result = convert_time(**tool_args)
+    else:
+        result = {"error": f"Unknown tool: {tool_name}"}
+        print(f"[DISPATCHER] {result['error']}")
+    
+    print(f"[DISPATCHER] Tool execution complete: {result}")
+    return result
+
@@ -0,0 +1,227 @@
+import contextvars
+import glob
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from mcp_tools.config import load_env
+
+# Request trace capture
+# A sampled /chat request records its model requests and responses, tool
+# calls, handoffs and timings, and is written as one line of gzipped JSONL
+# when it finishes. mcp_tools.replay re-runs these traces offline.
+#
+#   TRACE_SAMPLE_RATE  fraction of requests to record (default 0, off)
+#   TRACE_DIR          output directory (default ./traces)
+#   TRACE_MAX_BYTES    rotate a file once it grows past this size (default 10 MB)
+#   TRACE_BACKUPS      rotated files to keep per process (default 5)
+#   TRACE_MAX_FILES    trace files to keep in TRACE_DIR across all processes (default 50)
+#
+# Every process writes its own files, so restarted prefork workers leave old
+# ones behind; the oldest files in the directory are pruned past TRACE_MAX_FILES.
+
+_current = contextvars.ContextVar("mcp_tools_trace", default=None)
+
+_sample_rate = None
+_writer = None
+_lock = threading.Lock()
+
+class TraceWriter:
+    """Append trace records to a rotating, gzip-compressed JSONL file.
+
+    Each process writes its own file so prefork workers never interleave.
+    """
+
+    def __init__(self, directory, max_bytes=10 * 1024 * 1024, backups=5, max_files=50):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_files = max_files
+        self.pruned_pid = None  # pid that last pruned, so each process prunes on its first write
+        self.lock = threading.Lock()
+
+    def path(self, index=0):
+        suffix = f".{index}" if index else ""
+        return os.path.join(self.directory, f"trace-{os.getpid()}{suffix}.jsonl.gz")
+
+    def rotate(self):
+        oldest = self.path(self.backups)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, -1, -1):
+            if os.path.exists(self.path(index)):
+                os.replace(self.path(index), self.path(index + 1))
+
+    def prune(self):
+        """Remove the oldest trace files in the directory beyond max_files."""
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "trace-*.jsonl.gz")):
+            if path == self.path():
+                continue
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                # Rotated or pruned by another process meanwhile
+                continue
+        files.sort()
+        # This process's current file always counts towards the limit
+        for _, path in files[:max(0, len(files) + 1 - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.path()) and os.path.getsize(self.path()) >= self.max_bytes:
+                self.rotate()
+                self.prune()
+            elif self.pruned_pid != os.getpid():
+                # A new process (e.g. a restarted worker) starts a new file
+                self.prune()
+            self.pruned_pid = os.getpid()
+            # Every write appends a complete gzip member; readers see one stream
+            with gzip.open(self.path(), "at", encoding="utf-8") as f:
+                f.write(line)
+
+class MemoryWriter:
+    """Keep trace records in memory instead of writing them (used by replay)."""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+def configure(sample_rate=None, writer=None):
+    """Override the sample rate and/or writer instead of reading them from the environment."""
+    global _sample_rate, _writer
+    with _lock:
+        if sample_rate is not None:
+            _sample_rate = sample_rate
+        if writer is not None:
+            _writer = writer
+
+def get_sample_rate():
+    global _sample_rate
+    if _sample_rate is None:
+        load_env()
+        value = os.getenv("TRACE_SAMPLE_RATE", "0")
+        try:
+            _sample_rate = float(value)
+        except ValueError:
+            # Tracing must never fail the request it is observing
+            print(f"[TRACE] Invalid TRACE_SAMPLE_RATE {value!r}, tracing disabled")
+            _sample_rate = 0.0
+    return _sample_rate
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                load_env()
+                _writer = TraceWriter(
+                    os.getenv("TRACE_DIR", "traces"),
+                    max_bytes=int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024))),
+                    backups=int(os.getenv("TRACE_BACKUPS", "5")),
+                    max_files=int(os.getenv("TRACE_MAX_FILES", "50")),
+                )
+    return _writer
+
+class RequestTrace:
+    """Events for one /chat request. Unsampled traces ignore every call."""
+
+    def __init__(self, app_name, request, sampled):
+        self.sampled = sampled
+        self.trace_id = uuid.uuid4().hex
+        self.app = app_name
+        self.request = request
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.events = []
+        self.lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return round(1000 * (time.perf_counter() - self.started), 3)
+
+    def add_event(self, event_type, duration_ms, **fields):
+        if not self.sampled:
+            return
+        event = {"type": event_type, "t_ms": self.elapsed_ms(), "duration_ms": round(duration_ms, 3)}
+        event.update(fields)
+        with self.lock:
+            self.events.append(event)
+
+    def model_call(self, api, request, response, duration_ms):
+        """Record a model request and response; `api` says how to replay it."""
+        self.add_event("model", duration_ms, api=api, request=request, response=response)
+
+    def tool_call(self, name, args, result, duration_ms, prefetched=False):
+        self.add_event("tool", duration_ms, name=name, args=args, result=result, prefetched=prefetched)
+
+    def handoff(self, from_agent, to_agent):
+        self.add_event("handoff", 0, from_agent=from_agent, to_agent=to_agent)
+
+    def finish(self, response=None, status=200, error=None, cache=None):
+        """Write the trace if it was sampled and detach it from the current context.
+
+        `cache` is the response cache outcome ("hit", "miss" or "bypass");
+        a "hit" trace has no events and cannot be replayed.
+        """
+        if _current.get() is self:
+            _current.set(None)
+        if not self.sampled:
+            return
+
+        record = {
+            "trace_id": self.trace_id,
+            "app": self.app,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "duration_ms": self.elapsed_ms(),
+            "request": self.request,
+            "events": self.events,
+            "response": response,
+            "status": status,
+        }
+        if error is not None:
+            record["error"] = error
+        if cache is not None:
+            record["cache"] = cache
+
+        try:
+            get_writer().write(record)
+        except Exception as e:
+            # Tracing must never fail the request it is observing
+            print(f"[TRACE] Failed to write trace {self.trace_id}: {e}")
+
+def start_trace(app_name, request):
+    """Start a (possibly unsampled) trace for a request and make it current."""
+    rate = get_sample_rate()
+    sampled = rate > 0 and (rate >= 1 or random.random() < rate)
+    trace = RequestTrace(app_name, request, sampled)
+    _current.set(trace)
+    if sampled:
+        print(f"[TRACE] Recording trace {trace.trace_id}")
+    return trace
+
+def current_trace():
+    """The trace for the request being handled, or None."""
+    return _current.get()
+
+def read_traces(paths):
+    """Yield trace records from JSONL(.gz) files; globs are expanded."""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
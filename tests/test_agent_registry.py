@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools import agent_registry, tools
+
+UTILITY_TOOLS = {"add_numbers", "get_weather", "get_stock_price", "search_web", "calculate_mortgage"}
+
+def property_types(schema):
+    """Parameter name -> JSON type, ignoring the SDK's strict-mode extras (titles, nullable optionals)."""
+    types = {}
+    for name, prop in schema["properties"].items():
+        options = prop.get("anyOf", [prop])
+        types[name] = [option["type"] for option in options if option.get("type") != "null"]
+    return types
+
+def test_build_agents_is_built_once():
+    assert agent_registry.build_agents() is agent_registry.build_agents()
+
+def test_utility_with_handoffs_has_tools_and_handoffs():
+    agent = agent_registry.get_agent("utility_with_handoffs")
+    assert {tool.name for tool in agent.tools} == UTILITY_TOOLS
+    assert {h.agent_name for h in agent.handoffs} == {"FinancialSpecialist", "SpanishAssistant"}
+
+def test_agent_tools_match_tool_schemas():
+    expected = {tool["function"]["name"]: property_types(tool["function"]["parameters"]) for tool in tools.tools}
+    for schema in agent_registry.tool_schemas("utility"):
+        assert property_types(schema["parameters"]) == expected[schema["name"]]
@@ -0,0 +1,144 @@
+import sys
+import os
+import json
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools import cache
+from mcp_tools.cache import ResponseCache, normalize_message, cache_key, ttl_for_tools, parse_cache_control
+
+def test_normalize_message_ignores_case_whitespace_and_trailing_punctuation():
+    assert normalize_message("  What is   the weather in Paris?! ") == "what is the weather in paris"
+    assert normalize_message("What is\nAAPL at.") == normalize_message("what is aapl at")
+
+def test_cache_key_shared_by_trivial_variants():
+    assert cache_key("app", "What is AAPL at?", "o4-mini", "v1") == cache_key("app", "what is aapl at", "o4-mini", "v1")
+
+def test_cache_key_differs_by_scope_model_and_tool_version():
+    key = cache_key("app", "hi", "o4-mini", "v1")
+    assert cache_key("app_agents", "hi", "o4-mini", "v1") != key
+    assert cache_key("app", "hi", "gpt-4o", "v1") != key
+    assert cache_key("app", "hi", "o4-mini", "v2") != key
+
+def test_ttl_for_tools_uses_shortest():
+    assert ttl_for_tools(["get_weather", "get_current_time", "add_numbers"]) == 15
+
+def test_ttl_for_tools_never_expires_for_pure_tools():
+    assert ttl_for_tools(["add_numbers", "calculate_mortgage"]) is None
+
+def test_ttl_for_tools_without_tools(monkeypatch):
+    monkeypatch.setenv("CACHE_NO_TOOL_TTL", "120")
+    assert ttl_for_tools([]) == 120
+
+def test_ttl_for_unknown_tool():
+    assert ttl_for_tools(["add_numbers", "new_tool"]) == cache.UNKNOWN_TOOL_TTL
+
+def test_parse_cache_control():
+    assert parse_cache_control("No-Cache, max-age=0") == {"no-cache", "max-age=0"}
+    assert parse_cache_control(None) == set()
+
+def test_lru_evicts_least_recently_used():
+    response_cache = ResponseCache(max_entries=2)
+    response_cache.set("a", 1, None)
+    response_cache.set("b", 2, None)
+    assert response_cache.get("a") == 1
+    response_cache.set("c", 3, None)
+    assert response_cache.get("b") is None
+    assert response_cache.get("a") == 1
+    assert response_cache.get("c") == 3
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    response_cache = ResponseCache()
+    response_cache.set("a", 1, 15)
+    assert response_cache.get("a") == 1
+    now[0] += 15
+    assert response_cache.get("a") is None
+
+def test_disk_round_trip(tmp_path):
+    ResponseCache(directory=str(tmp_path)).set("a", {"response": "hi"}, 60)
+    # A fresh instance, like another worker, reads the entry from disk
+    assert ResponseCache(directory=str(tmp_path)).get("a") == {"response": "hi"}
+
+def test_disk_expired_entry_is_removed(tmp_path):
+    ResponseCache(directory=str(tmp_path)).set("a", 1, 0)
+    assert ResponseCache(directory=str(tmp_path)).get("a") is None
+    assert not (tmp_path / "a.json").exists()
+
+def test_sweep_removes_expired_then_oldest(tmp_path):
+    response_cache = ResponseCache(directory=str(tmp_path), disk_max_entries=2)
+    for i, (key, expires_at) in enumerate([("old", None), ("expired", 1.0), ("mid", None), ("new", None)]):
+        path = tmp_path / f"{key}.json"
+        path.write_text(json.dumps({"expires_at": expires_at, "value": key}))
+        os.utime(path, (1000 + i, 1000 + i))
+
+    assert response_cache.sweep_disk() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["mid.json", "new.json"]
+
+def test_sweep_enforces_byte_bound(tmp_path):
+    response_cache = ResponseCache(directory=str(tmp_path), disk_max_bytes=1)
+    response_cache.write_disk("a", None, "x")
+    response_cache.sweep_disk()
+    assert list(tmp_path.iterdir()) == []
+
+def test_set_sweeps_at_most_once_per_interval(tmp_path):
+    response_cache = ResponseCache(directory=str(tmp_path), disk_max_entries=1, sweep_interval=3600)
+    response_cache.set("a", 1, None)
+    response_cache.set("b", 2, None)
+    # The first set swept; the second is within the interval
+    assert len(list(tmp_path.iterdir())) == 2
+
+def chat_with_tool_result(monkeypatch, tool_result):
+    """POST to app.py's /chat with the model asking for one get_current_time call."""
+    import app
+    from mcp_tools.replay import ReplayClient
+
+    def completion(message):
+        return {"type": "model", "duration_ms": 0, "response": {
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "o4-mini",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+        }}
+
+    client = ReplayClient([
+        completion({"role": "assistant", "content": None, "tool_calls": [{
+            "id": "call_1", "type": "function",
+            "function": {"name": "get_current_time", "arguments": json.dumps({"timezone": "Europe/London"})},
+        }]}),
+        completion({"role": "assistant", "content": "It is noon."}),
+    ])
+    response_cache = ResponseCache()
+    monkeypatch.setenv("TOOL_PREFETCH", "0")
+    monkeypatch.setattr(app, "get_openai_client", lambda: client)
+    monkeypatch.setattr(app, "get_cache", lambda: response_cache)
+    monkeypatch.setattr(app, "execute_tool", lambda name, args: tool_result)
+
+    response = app.app.test_client().post("/chat", json={"message": "What time is it in London?"})
+    assert response.status_code == 200
+    return response_cache
+
+def test_app_caches_answers_from_successful_tools(monkeypatch):
+    response_cache = chat_with_tool_result(monkeypatch, {"timezone": "Europe/London", "datetime": "12:00"})
+    assert len(response_cache.entries) == 1
+
+def test_app_does_not_cache_answers_from_failed_tools(monkeypatch):
+    response_cache = chat_with_tool_result(monkeypatch, {"error": "Error getting current time: connection refused"})
+    assert len(response_cache.entries) == 0
+
+def test_agent_tools_failed_detects_error_outputs():
+    from types import SimpleNamespace
+    from agents.items import ToolCallOutputItem
+    from mcp_tools import agent_registry
+
+    agent = agent_registry.get_agent("utility")
+
+    def run_result(*outputs):
+        return SimpleNamespace(new_items=[
+            ToolCallOutputItem(agent=agent, raw_item={"call_id": "call_1", "output": output, "type": "function_call_output"},
+                               output=output)
+            for output in outputs
+        ])
+
+    assert agent_registry.tools_failed(run_result("5", '{"temp_c":21}')) is False
+    assert agent_registry.tools_failed(run_result("5", '{"error":"Error converting time: timeout"}')) is True
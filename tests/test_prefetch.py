@@ -0,0 +1,80 @@
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools import prefetch
+from mcp_tools.prefetch import extract_prefetch_calls, prefetch_key, take_prefetched
+
+def test_extract_tickers():
+    calls = extract_prefetch_calls("What is the price of Apple (AAPL) and $MSFT stock?")
+    assert ("get_stock_price", {"ticker": "AAPL"}) in calls
+    assert ("get_stock_price", {"ticker": "MSFT"}) in calls
+
+def test_extract_company_names_only_for_stock_questions():
+    assert ("get_stock_price", {"ticker": "TSLA"}) in extract_prefetch_calls("How are Tesla shares doing?")
+    assert extract_prefetch_calls("I drove my Tesla to work") == []
+
+def test_extract_tickers_deduplicated():
+    calls = extract_prefetch_calls("Apple (AAPL) stock: is AAPL up?")
+    assert calls.count(("get_stock_price", {"ticker": "AAPL"})) == 1
+
+def test_extract_weather_location():
+    calls = extract_prefetch_calls("What is the weather in San Francisco, CA? Also AAPL")
+    assert ("get_weather", {"location": "San Francisco, CA"}) in calls
+
+def test_extract_timezone_needs_time_question():
+    assert extract_prefetch_calls("What time is it in Europe/London?") == [
+        ("get_current_time", {"timezone": "Europe/London"})
+    ]
+    assert extract_prefetch_calls("I moved to Europe/London") == []
+
+def test_extract_nothing_from_plain_text():
+    assert extract_prefetch_calls("What is 42 plus 7?") == []
+
+def test_extract_acronyms_outside_stock_questions_are_not_tickers():
+    assert extract_prefetch_calls("Population of the United States (USA)?") == []
+    assert extract_prefetch_calls("Is the meeting at 9 (UTC) or plan (A)? Costs $US") == []
+
+def test_extract_unknown_symbols_in_stock_questions():
+    assert extract_prefetch_calls("What is the stock price of Nvidia (NVDA)?") == [
+        ("get_stock_price", {"ticker": "NVDA"})
+    ]
+
+def test_extract_caps_number_of_calls():
+    message = "stock prices: " + " ".join(f"({chr(65 + i)}{chr(65 + i)})" for i in range(20))
+    assert len(extract_prefetch_calls(message)) == prefetch.PREFETCH_MAX_CALLS
+
+def test_prefetch_key_ignores_surrounding_whitespace():
+    assert prefetch_key("get_weather", {"location": " Paris "}) == prefetch_key("get_weather", {"location": "Paris"})
+
+def test_take_prefetched_uses_finished_result():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = {prefetch_key("get_stock_price", {"ticker": "AAPL"}): executor.submit(lambda: {"price_usd": 1})}
+        assert take_prefetched(futures, "get_stock_price", {"ticker": "AAPL"}) == (True, {"price_usd": 1})
+        assert futures == {}
+
+def test_take_prefetched_misses_on_other_args():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures = {prefetch_key("get_stock_price", {"ticker": "AAPL"}): executor.submit(lambda: 1)}
+        assert take_prefetched(futures, "get_stock_price", {"ticker": "MSFT"}) == (False, None)
+        assert len(futures) == 1
+
+def test_take_prefetched_cancels_queued_prefetch():
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Occupy the only worker so the prefetch stays queued
+        executor.submit(release.wait)
+        queued = executor.submit(lambda: "never run")
+        futures = {prefetch_key("get_weather", {"location": "Paris"}): queued}
+        stats_before = dict(prefetch.prefetch_stats)
+
+        assert take_prefetched(futures, "get_weather", {"location": "Paris"}) == (False, None)
+        assert queued.cancelled()
+        # The model asked for it, so it is late rather than wasted
+        assert prefetch.prefetch_stats["late"] == stats_before["late"] + 1
+        assert prefetch.prefetch_stats["wasted"] == stats_before["wasted"]
+        release.set()
@@ -0,0 +1,116 @@
+import sys
+import os
+import json
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools import agent_registry, tracing
+from mcp_tools.config import get_openai_client, set_openai_client
+from mcp_tools.replay import ReplayClient, install_replay, replay_once
+
+def completion(message):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "o4-mini",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+    }
+
+def model_event(message):
+    return {"type": "model", "api": "chat.completions", "t_ms": 0, "duration_ms": 5.0,
+            "request": {}, "response": completion(message)}
+
+# What app.py records for "What is 2 plus 3?": one add_numbers call, then the answer
+APP_TRACE = {
+    "trace_id": "test",
+    "app": "app",
+    "request": {"message": "What is 2 plus 3?"},
+    "status": 200,
+    "response": {"response": "2 plus 3 is 5."},
+    "events": [
+        model_event({"role": "assistant", "content": None, "tool_calls": [{
+            "id": "call_1", "type": "function",
+            "function": {"name": "add_numbers", "arguments": json.dumps({"a": 2, "b": 3})},
+        }]}),
+        {"type": "tool", "name": "add_numbers", "args": {"a": 2, "b": 3}, "result": 5,
+         "t_ms": 5, "duration_ms": 0.1, "prefetched": False},
+        model_event({"role": "assistant", "content": "2 plus 3 is 5."}),
+    ],
+}
+
+def test_install_replay_restores_previous_client_and_provider(monkeypatch):
+    client, provider = object(), object()
+    monkeypatch.setattr(agent_registry, "model_provider", provider)
+    previous = set_openai_client(client)
+    try:
+        restore = install_replay({"events": []})
+        assert isinstance(get_openai_client(), ReplayClient)
+        assert agent_registry.model_provider is not provider
+
+        restore()
+        assert get_openai_client() is client
+        assert agent_registry.model_provider is provider
+    finally:
+        set_openai_client(previous)
+
+def test_replay_once_serves_recorded_model_responses(monkeypatch):
+    collector = tracing.MemoryWriter()
+    monkeypatch.setattr(tracing, "_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "_writer", collector)
+    monkeypatch.setenv("TOOL_PREFETCH", "0")
+
+    replayed = replay_once(APP_TRACE, collector)
+
+    assert replayed["status"] == 200
+    assert replayed["response"] == APP_TRACE["response"]
+    assert replayed["cache"] == "bypass"
+    tool_events = [e for e in replayed["events"] if e["type"] == "tool"]
+    assert [(e["name"], e["args"], e["result"]) for e in tool_events] == [("add_numbers", {"a": 2, "b": 3}, 5)]
+    assert len([e for e in replayed["events"] if e["type"] == "model"]) == 2
+
+def test_replay_once_fails_when_trace_runs_out_of_responses(monkeypatch):
+    collector = tracing.MemoryWriter()
+    monkeypatch.setattr(tracing, "_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "_writer", collector)
+
+    # Only the tool-call turn was recorded, so the second model call has no answer
+    record = dict(APP_TRACE, events=APP_TRACE["events"][:1])
+    assert replay_once(record, collector)["status"] == 500
+
+def responses_event(*output):
+    return {"type": "model", "api": "responses", "t_ms": 0, "duration_ms": 5.0,
+            "request": {}, "response": {"output": list(output), "usage": {}, "response_id": None}}
+
+# What app_agents.py records for the same question via the Responses API
+AGENTS_TRACE = {
+    "trace_id": "test-agents",
+    "app": "app_agents",
+    "request": {"message": "What is 2 plus 3?"},
+    "status": 200,
+    "response": {"response": "2 plus 3 is 5."},
+    "events": [
+        responses_event({"type": "function_call", "id": "fc_1", "call_id": "call_1", "name": "add_numbers",
+                         "arguments": json.dumps({"a": 2, "b": 3}), "status": "completed"}),
+        responses_event({"type": "message", "id": "msg_1", "role": "assistant", "status": "completed",
+                         "content": [{"type": "output_text", "text": "2 plus 3 is 5.", "annotations": []}]}),
+    ],
+}
+
+def test_replay_once_runs_agents_from_recorded_responses(monkeypatch):
+    collector = tracing.MemoryWriter()
+    monkeypatch.setattr(tracing, "_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "_writer", collector)
+
+    replayed = replay_once(AGENTS_TRACE, collector)
+
+    assert replayed["status"] == 200
+    assert replayed["response"] == AGENTS_TRACE["response"]
+    # Agent tool calls are recorded with their arguments named, as the model sent them
+    tool_events = [e for e in replayed["events"] if e["type"] == "tool"]
+    assert [(e["name"], e["args"], e["result"]) for e in tool_events] == [("add_numbers", {"a": 2, "b": 3}, 5)]
+    # The replayed run records its model calls through the recording provider
+    model_events = [e for e in replayed["events"] if e["type"] == "model"]
+    assert [e["api"] for e in model_events] == ["responses", "responses"]
+    assert model_events[0]["request"]["tools"] == [t.name for t in agent_registry.get_agent("utility").tools]
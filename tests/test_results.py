@@ -0,0 +1,50 @@
+import sys
+import os
+import json
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools.results import encode_tool_result, result_format, shrink_to_fit
+
+def test_small_result_is_compact_json():
+    assert encode_tool_result("get_stock_price", {"ticker": "AAPL", "price_usd": 187.45}) == '{"ticker":"AAPL","price_usd":187.45}'
+
+def test_render_and_cap_are_per_tool():
+    @result_format(max_chars=60, render=lambda r: r["keep"])
+    def capped_tool():
+        pass
+
+    assert encode_tool_result("capped_tool", {"keep": [1, 2], "drop": "x"}) == "[1,2]"
+    encoded = encode_tool_result("capped_tool", {"keep": list(range(100))})
+    assert len(encoded) <= 60
+    assert json.loads(encoded)["truncated"] is True
+
+def test_oversized_result_drops_trailing_list_items():
+    value = {"date": "2026-10-19", "results": [f"result number {i}" for i in range(50)]}
+    encoded = shrink_to_fit(value, 120)
+    decoded = json.loads(encoded)
+    assert len(encoded) <= 120
+    assert decoded["truncated"] is True
+    assert decoded["date"] == "2026-10-19"
+    assert decoded["results"] == value["results"][:len(decoded["results"])]
+    # The caller's value is left untouched
+    assert len(value["results"]) == 50
+
+def test_oversized_strings_are_shortened():
+    encoded = shrink_to_fit({"text": "x" * 1000}, 100)
+    decoded = json.loads(encoded)
+    assert len(encoded) <= 100
+    assert decoded["text"].endswith("…")
+
+def test_oversized_list_is_wrapped():
+    decoded = json.loads(shrink_to_fit(list(range(1000)), 50))
+    assert decoded["truncated"] is True
+    assert decoded["items"] == list(range(len(decoded["items"])))
+
+def test_plain_strings_are_cut_with_marker():
+    @result_format(max_chars=10)
+    def text_tool():
+        pass
+
+    assert encode_tool_result("text_tool", "abcdefghijklmnop") == "abcdefghi…"
@@ -0,0 +1,72 @@
+import sys
+import os
+import gzip
+
+# Add the src directory to the path so we can import the main module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp_tools import tracing
+from mcp_tools.tracing import TraceWriter, MemoryWriter, start_trace, current_trace, read_traces
+
+def test_writer_round_trip(tmp_path):
+    writer = TraceWriter(str(tmp_path))
+    writer.write({"trace_id": "a"})
+    writer.write({"trace_id": "b"})
+    assert [r["trace_id"] for r in read_traces([str(tmp_path / "trace-*.jsonl.gz")])] == ["a", "b"]
+
+def test_writer_rotates_and_keeps_backups(tmp_path):
+    writer = TraceWriter(str(tmp_path), max_bytes=1, backups=2)
+    for trace_id in "abcd":
+        writer.write({"trace_id": trace_id})
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        os.path.basename(writer.path(index)) for index in range(3)
+    )
+    # The oldest record was rotated out; the rest are spread over the files
+    assert sorted(r["trace_id"] for r in read_traces([str(tmp_path / "trace-*")])) == ["b", "c", "d"]
+
+def test_writer_prunes_other_processes_files(tmp_path):
+    for pid in range(5):
+        path = tmp_path / f"trace-{pid}.jsonl.gz"
+        with gzip.open(path, "wt") as f:
+            f.write('{"trace_id": "old"}\n')
+        os.utime(path, (1000 + pid, 1000 + pid))
+
+    TraceWriter(str(tmp_path), max_files=3).write({"trace_id": "new"})
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["trace-3.jsonl.gz", "trace-4.jsonl.gz", f"trace-{os.getpid()}.jsonl.gz"]
+    )
+
+def test_unsampled_trace_records_nothing(monkeypatch):
+    writer = MemoryWriter()
+    monkeypatch.setattr(tracing, "_sample_rate", 0.0)
+    monkeypatch.setattr(tracing, "_writer", writer)
+
+    trace = start_trace("app", {"message": "hi"})
+    assert current_trace() is trace
+    trace.tool_call("add_numbers", {"a": 1, "b": 2}, {"sum": 3}, 0.1)
+    trace.finish(response={"response": "3"})
+
+    assert trace.events == []
+    assert writer.records == []
+    assert current_trace() is None
+
+def test_sampled_trace_is_written(monkeypatch):
+    writer = MemoryWriter()
+    monkeypatch.setattr(tracing, "_sample_rate", 1.0)
+    monkeypatch.setattr(tracing, "_writer", writer)
+
+    trace = start_trace("app", {"message": "hi"})
+    trace.tool_call("add_numbers", {"a": 1, "b": 2}, {"sum": 3}, 0.1)
+    trace.finish(response={"response": "3"}, cache="miss")
+
+    [record] = writer.records
+    assert record["request"] == {"message": "hi"}
+    assert [e["name"] for e in record["events"]] == ["add_numbers"]
+    assert record["cache"] == "miss"
+
+def test_invalid_sample_rate_disables_tracing(monkeypatch):
+    monkeypatch.setattr(tracing, "_sample_rate", None)
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "five percent")
+    assert tracing.get_sample_rate() == 0
+    assert start_trace("app", {"message": "hi"}).sampled is False